@@ -1,27 +1,113 @@
 """Agent registry service with A2A protocol support."""
 
-import json
+import asyncio
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from itertools import chain
 from pathlib import Path
-from typing import Optional
+from typing import Container, Iterator, Optional
 
+import msgspec
+import orjson
+from pydantic import HttpUrl, TypeAdapter
+
+from bm25_index import BM25Index
 from config import settings
-from models import AgentCard, AgentInfo, AgentRegistrationRequest, Skill
+from embedding_index import EmbeddingIndex
+from models import AgentCard, AgentInfo, AgentRegistrationRequest, DiscoveryQuery, Skill
+from ollama_service import ollama_service
+from registry_columns import AgentRegistryColumns
 
 logger = logging.getLogger(__name__)
 
+# Coalescing window for agents.jsonl / state.json rewrites
+_FLUSH_DELAY = 0.1
+
+_AGENTS_FILE = "agents.jsonl"
+
+_UTC = timezone.utc
+
+# AgentCard stores URLs as plain strings; updates are checked against this
+_URL_ADAPTER = TypeAdapter(HttpUrl)
+
+# Reciprocal-rank fusion damping constant
+_RRF_K = 60
+
+# Seconds to rank with BM25 alone after a query embedding fails or times out
+_DENSE_RETRY_DELAY = 30.0
+
+# AgentCard fields that are plain strings and can be updated without revalidation
+_TEXT_FIELDS = frozenset(
+    {
+        "name",
+        "description",
+        "protocol_version",
+        "version",
+        "license",
+        "visibility",
+        "trust_level",
+        "registered_by",
+    }
+)
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write bytes to a sibling temp file, fsync it and move it into place."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _utcnow() -> datetime:
+    """Current UTC time as an aware datetime."""
+    return datetime.now(_UTC)
+
 
-def _path_to_filename(path: str) -> str:
-    """Convert agent path to safe filename."""
-    normalized = path.lstrip("/").replace("/", "_")
-    if not normalized.endswith("_agent.json"):
-        normalized += "_agent.json"
-    return normalized
+def _skill_keys(agent: AgentCard) -> set[str]:
+    """Lowercased skill ids and names an agent can be discovered by."""
+    return {s.id.lower() for s in agent.skills} | {s.name.lower() for s in agent.skills}
+
+
+def _rrf_fuse(*rankings: list[str]) -> list[str]:
+    """Merge ranked lists by reciprocal-rank fusion, best first."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, path in enumerate(ranking, 1):
+            scores[path] = scores.get(path, 0.0) + 1.0 / (_RRF_K + rank)
+    return sorted(scores, key=scores.__getitem__, reverse=True)
+
+
+def _encode_agent(agent: AgentCard) -> bytes:
+    """Encode an agent card as a single agents.jsonl line."""
+    return orjson.dumps(agent.model_dump(), option=orjson.OPT_UTC_Z) + b"\n"
+
+
+def _validate_update_urls(updates: dict) -> dict:
+    """Check URL fields in an update as HttpUrl and return them as strings."""
+    updates = dict(updates)
+    if "url" in updates:
+        updates["url"] = str(_URL_ADAPTER.validate_python(updates["url"]))
+    provider = updates.get("provider")
+    if isinstance(provider, dict) and provider.get("url") is not None:
+        updates["provider"] = {
+            **provider,
+            "url": str(_URL_ADAPTER.validate_python(provider["url"])),
+        }
+    return updates
 
 
 def _normalize_path(path: Optional[str], agent_name: Optional[str] = None) -> str:
     """Normalize agent path format."""
+    # Fast path: already normalized (e.g. internal registry keys)
+    if path and path.startswith("/") and (len(path) == 1 or not path.endswith("/")):
+        return path
+
     if path is None:
         if not agent_name:
             raise ValueError("Path or agent_name required")
@@ -39,64 +125,184 @@ class AgentService:
     def __init__(self):
         """Initialize agent service."""
         self._agents: dict[str, AgentCard] = {}
-        self._state: dict[str, list[str]] = {"enabled": [], "disabled": []}
+        self._state: dict[str, set[str]] = {"enabled": set(), "disabled": set()}
         self._data_dir = Path(settings.data_dir) / "agents"
+        self._info_cache: dict[str, dict] = {}
+        self._listing_bytes: Optional[bytes] = None
+        self._search_index: dict[str, str] = {}
+        # Registration sequence number per path, for ordering index hits like self._agents
+        self._order: dict[str, int] = {}
+        self._next_order = 0
+        # Inverted indexes: lowercased skill id/name or tag -> agent paths
+        self._by_skill: dict[str, set[str]] = {}
+        self._by_tag: dict[str, set[str]] = {}
+        self._columns = AgentRegistryColumns()
+        self._bm25 = BM25Index()
+        self._embeddings = EmbeddingIndex()
+        self._embed_tasks: set[asyncio.Task] = set()
+        # bm25_only: confident keyword hit; hybrid: dense ranking fused in;
+        # bm25_fallback: dense wanted but unavailable (no vectors, Ollama down or backing off)
+        self._discovery_stats = {"bm25_only": 0, "hybrid": 0, "bm25_fallback": 0}
+        self._dense_retry_at = 0.0  # monotonic time before which dense search is skipped
+        self._agents_dirty = False
+        self._state_dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
 
     def initialize(self) -> None:
         """Load agents from disk."""
         self._data_dir.mkdir(parents=True, exist_ok=True)
         self._load_agents()
+        self._migrate_agent_files()
         self._load_state()
+        for agent in self._agents.values():
+            self._index_agent(agent)
         logger.info(f"Loaded {len(self._agents)} agents")
 
     def _load_agents(self) -> None:
-        """Load agent cards from disk."""
-        for file in self._data_dir.glob("*_agent.json"):
-            try:
-                with open(file) as f:
-                    data = json.load(f)
-                agent = AgentCard(**data)
-                self._agents[agent.path] = agent
-            except Exception as e:
-                logger.error(f"Failed to load {file}: {e}")
+        """Load agent cards from agents.jsonl."""
+        agents_file = self._data_dir / _AGENTS_FILE
+        if not agents_file.exists():
+            return
+
+        with open(agents_file, "rb") as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    agent = AgentCard.model_validate_json(line)
+                    self._agents[agent.path] = agent
+                except Exception as e:
+                    logger.error(f"Failed to load {agents_file}:{lineno}: {e}")
+
+    def _migrate_agent_files(self) -> None:
+        """Fold legacy per-agent *_agent.json files into agents.jsonl."""
+        files = list(self._data_dir.glob("*_agent.json"))
+        if not files:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(16, len(files))) as executor:
+            agents = list(executor.map(self._load_one_agent_file, files))
+
+        migrated = [(f, a) for f, a in zip(files, agents) if a is not None]
+        if not migrated:
+            return
+
+        for _, agent in migrated:
+            self._agents.setdefault(agent.path, agent)
+
+        self._agents_dirty = True  # Retried on the next flush if this write fails
+        if not self._write_agents():
+            return
+        # Keep the originals under a new name so an older release can still be restored
+        for file, _ in migrated:
+            file.rename(file.with_name(file.name + ".migrated"))
+        logger.info(f"Migrated {len(migrated)} agent files to {_AGENTS_FILE}")
+
+    def _load_one_agent_file(self, file: Path) -> Optional[AgentCard]:
+        """Read and parse a single agent card file."""
+        try:
+            return AgentCard.model_validate_json(file.read_bytes())
+        except Exception as e:
+            logger.error(f"Failed to load {file}: {e}")
+            return None
 
     def _load_state(self) -> None:
         """Load agent enable/disable state."""
         state_file = self._data_dir / "state.json"
         if state_file.exists():
             try:
-                with open(state_file) as f:
-                    self._state = json.load(f)
+                with open(state_file, "rb") as f:
+                    data = orjson.loads(f.read())
+                self._state = {
+                    "enabled": set(data.get("enabled", [])),
+                    "disabled": set(data.get("disabled", [])),
+                }
             except Exception as e:
                 logger.error(f"Failed to load state: {e}")
 
         # Initialize state for new agents
-        for path in self._agents:
-            if path not in self._state["enabled"] and path not in self._state["disabled"]:
-                self._state["enabled"].append(path)
+        known = self._state["enabled"] | self._state["disabled"]
+        self._state["enabled"].update(p for p in self._agents if p not in known)
+
+    def _mark_state_dirty(self) -> None:
+        """Schedule a debounced write of state to disk."""
+        self._state_dirty = True
+        self._schedule_flush()
+
+    def _mark_agents_dirty(self) -> None:
+        """Schedule a debounced rewrite of agents.jsonl."""
+        self._agents_dirty = True
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Start the debounced flush task unless one is already pending."""
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. CLI usage) - write immediately
+            self._write_dirty()
+            return
+        self._flush_task = loop.create_task(self._flush_after(_FLUSH_DELAY))
+
+    async def _flush_after(self, delay: float) -> None:
+        """Wait for further changes to coalesce, then persist them."""
+        await asyncio.sleep(delay)
+        self._write_dirty()
+
+    def _write_dirty(self) -> None:
+        """Persist whichever of agents/state has pending changes."""
+        if self._agents_dirty:
+            self._write_agents()
+        if self._state_dirty:
+            self._write_state()
+
+    def _write_agents(self) -> bool:
+        """Rewrite agents.jsonl from the in-memory registry atomically."""
+        try:
+            data = b"".join(_encode_agent(a) for a in self._agents.values())
+            _atomic_write_bytes(self._data_dir / _AGENTS_FILE, data)
+            self._agents_dirty = False  # Left set on failure so the next flush retries
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save agents: {e}")
+            return False
 
-    def _save_state(self) -> None:
-        """Persist state to disk."""
-        state_file = self._data_dir / "state.json"
+    def _write_state(self) -> None:
+        """Persist state to disk atomically."""
         try:
-            with open(state_file, "w") as f:
-                json.dump(self._state, f, indent=2)
+            data = {
+                "enabled": sorted(self._state["enabled"]),
+                "disabled": sorted(self._state["disabled"]),
+            }
+            _atomic_write_bytes(
+                self._data_dir / "state.json", orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            )
+            self._state_dirty = False
         except Exception as e:
             logger.error(f"Failed to save state: {e}")
 
-    def _save_agent(self, agent: AgentCard) -> bool:
-        """Save agent card to disk."""
+    async def flush(self) -> None:
+        """Write any pending agent or state changes to disk."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        self._write_dirty()
+
+    def _append_agent(self, agent: AgentCard) -> bool:
+        """Append a new agent card to agents.jsonl."""
         try:
-            filename = _path_to_filename(agent.path)
-            file_path = self._data_dir / filename
-            with open(file_path, "w") as f:
-                json.dump(agent.model_dump(mode="json"), f, indent=2)
+            with open(self._data_dir / _AGENTS_FILE, "ab") as f:
+                f.write(_encode_agent(agent))
             return True
         except Exception as e:
             logger.error(f"Failed to save agent: {e}")
             return False
 
-    def register(self, request: AgentRegistrationRequest, registered_by: str = "system") -> AgentCard:
+    def register(
+        self, request: AgentRegistrationRequest, registered_by: str = "system"
+    ) -> AgentCard:
         """Register a new agent."""
         path = _normalize_path(request.path, request.name)
 
@@ -108,21 +314,18 @@ class AgentService:
         for skill_data in request.skills:
             skills.append(Skill(**skill_data))
 
-        # Parse tags
-        tags = [t.strip() for t in request.tags.split(",") if t.strip()]
-
         # Create agent card
-        now = datetime.now(timezone.utc)
+        now = _utcnow()
         agent = AgentCard(
             name=request.name,
             description=request.description,
-            url=request.url,
+            url=str(request.url),
             path=path,
             protocol_version=request.protocol_version,
             version=request.version,
             skills=skills,
             streaming=request.streaming,
-            tags=tags,
+            tags=request.tags,
             license=request.license,
             visibility=request.visibility,
             registered_by=registered_by,
@@ -132,12 +335,14 @@ class AgentService:
         )
 
         # Save and register
-        if not self._save_agent(agent):
+        if not self._append_agent(agent):
             raise ValueError("Failed to save agent")
 
         self._agents[path] = agent
-        self._state["enabled"].append(path)
-        self._save_state()
+        self._state["enabled"].add(path)
+        self._mark_state_dirty()
+        self._index_agent(agent)
+        self._schedule_embedding(agent)
 
         logger.info(f"Registered agent: {agent.name} at {path}")
         return agent
@@ -149,10 +354,15 @@ class AgentService:
 
     def list_agents(self, enabled_only: bool = False) -> list[AgentCard]:
         """List all agents."""
-        agents = list(self._agents.values())
         if enabled_only:
-            agents = [a for a in agents if a.path in self._state["enabled"]]
-        return agents
+            enabled = self._state["enabled"]
+            return [a for p, a in self._agents.items() if p in enabled]
+        return list(self._agents.values())
+
+    def iter_enabled(self) -> Iterator[AgentCard]:
+        """Iterate over enabled agents without building a list."""
+        enabled = self._state["enabled"]
+        return (a for p, a in self._agents.items() if p in enabled)
 
     def update(self, path: str, updates: dict) -> AgentCard:
         """Update an existing agent."""
@@ -161,14 +371,20 @@ class AgentService:
         if not agent:
             raise ValueError(f"Agent not found: {path}")
 
-        # Merge updates
-        agent_dict = agent.model_dump()
-        agent_dict.update(updates)
-        agent_dict["updated_at"] = datetime.now(timezone.utc)
+        if "url" in updates or "provider" in updates:
+            updates = _validate_update_urls(updates)
 
-        updated = AgentCard(**agent_dict)
-        self._save_agent(updated)
+        # Merge updates
+        now = _utcnow()
+        if all(k in _TEXT_FIELDS and isinstance(v, str) for k, v in updates.items()):
+            updated = agent.model_copy(update={**updates, "updated_at": now})
+        else:
+            updated = AgentCard.model_validate({**agent.model_dump(), **updates, "updated_at": now})
+        self._unindex_agent(agent)
         self._agents[path] = updated
+        self._mark_agents_dirty()
+        self._index_agent(updated)
+        self._schedule_embedding(updated)
 
         return updated
 
@@ -178,21 +394,16 @@ class AgentService:
         if path not in self._agents:
             return False
 
-        # Remove file
-        filename = _path_to_filename(path)
-        file_path = self._data_dir / filename
-        if file_path.exists():
-            file_path.unlink()
-
         # Remove from registry
-        del self._agents[path]
+        self._unindex_agent(self._agents.pop(path))
+        self._order.pop(path, None)
+        self._embeddings.remove(path)
+        self._mark_agents_dirty()
 
         # Update state
-        if path in self._state["enabled"]:
-            self._state["enabled"].remove(path)
-        if path in self._state["disabled"]:
-            self._state["disabled"].remove(path)
-        self._save_state()
+        self._state["enabled"].discard(path)
+        self._state["disabled"].discard(path)
+        self._mark_state_dirty()
 
         return True
 
@@ -203,17 +414,18 @@ class AgentService:
             return False
 
         if enabled:
-            if path in self._state["disabled"]:
-                self._state["disabled"].remove(path)
-            if path not in self._state["enabled"]:
-                self._state["enabled"].append(path)
+            self._state["disabled"].discard(path)
+            self._state["enabled"].add(path)
         else:
-            if path in self._state["enabled"]:
-                self._state["enabled"].remove(path)
-            if path not in self._state["disabled"]:
-                self._state["disabled"].append(path)
-
-        self._save_state()
+            self._state["enabled"].discard(path)
+            self._state["disabled"].add(path)
+
+        self._mark_state_dirty()
+        self._columns.set_enabled(path, enabled)
+        info = self._info_cache.get(path)
+        if info is not None:
+            info["is_enabled"] = enabled
+        self._listing_bytes = None
         return True
 
     def is_enabled(self, path: str) -> bool:
@@ -227,16 +439,220 @@ class AgentService:
             name=agent.name,
             description=agent.description,
             path=agent.path,
-            url=str(agent.url),
+            url=agent.url,
             tags=agent.tags,
             skills=[s.name for s in agent.skills],
             num_skills=len(agent.skills),
-            is_enabled=self.is_enabled(agent.path),
+            is_enabled=agent.path in self._state["enabled"],
             provider=agent.provider.organization if agent.provider else None,
             streaming=agent.streaming,
             trust_level=agent.trust_level,
         )
 
+    def _index_agent(self, agent: AgentCard) -> None:
+        """Precompute the cached summary and search keys for an agent."""
+        self._info_cache[agent.path] = msgspec.to_builtins(self.to_info(agent))
+        self._listing_bytes = None
+        if agent.path not in self._order:
+            self._order[agent.path] = self._next_order
+            self._next_order += 1
+        self._columns.upsert(agent.path, agent.path in self._state["enabled"], agent.visibility)
+        self._search_index[agent.path] = (
+            f"{agent.name}\x00{agent.description}\x00{' '.join(agent.tags)}".lower()
+        )
+        for key in _skill_keys(agent):
+            self._by_skill.setdefault(key, set()).add(agent.path)
+        for tag in agent.tags:
+            self._by_tag.setdefault(tag.lower(), set()).add(agent.path)
+        skills_text = " ".join(f"{s.name} {s.description}" for s in agent.skills)
+        self._bm25.add(
+            agent.path,
+            f"{agent.name} {agent.description} {skills_text} {' '.join(agent.tags)}",
+        )
+
+    def _unindex_agent(self, agent: AgentCard) -> None:
+        """Drop precomputed data for a removed or replaced agent."""
+        path = agent.path
+        self._info_cache.pop(path, None)
+        self._listing_bytes = None
+        self._search_index.pop(path, None)
+        self._columns.remove(path)
+        self._bm25.remove(path)
+        for index, keys in (
+            (self._by_skill, _skill_keys(agent)),
+            (self._by_tag, {t.lower() for t in agent.tags}),
+        ):
+            for key in keys:
+                paths = index.get(key)
+                if paths is not None:
+                    paths.discard(path)
+                    if not paths:
+                        del index[key]
+
+    def get_info(self, path: str) -> dict:
+        """Get the cached AgentInfo summary for a registered agent path."""
+        return self._info_cache[path]
+
+    def listing_json(self) -> bytes:
+        """Get the serialized listing of all agents, cached until the next change."""
+        if self._listing_bytes is None:
+            info = self._info_cache
+            agents = [info[p] for p in self._agents]  # Registration order, like list_agents
+            self._listing_bytes = orjson.dumps({"agents": agents, "total": len(agents)})
+        return self._listing_bytes
+
+    def search(self, query_lower: str, enabled_only: bool = False) -> list[AgentCard]:
+        """Find agents whose name, description or tags contain a lowercased query."""
+        index = self._search_index
+        agents = self.iter_enabled() if enabled_only else self._agents.values()
+        return [a for a in agents if query_lower in index[a.path]]
+
+    async def discover(self, query: DiscoveryQuery) -> list[dict]:
+        """Find enabled, public agents by skills and query text.
+
+        Agents offering any requested skill (by id or name) come first, or every
+        agent when the query text is empty. Query text is then ranked by fusing
+        BM25 keyword and embedding similarity rankings, followed by any remaining
+        substring matches. All requested tags must be present.
+        """
+        candidates = self._columns.discoverable()
+        if query.tags:
+            # Tag postings bound the candidates; otherwise filter hits through the columns
+            tagged = set.intersection(*(self._by_tag.get(t.lower(), set()) for t in query.tags))
+            candidates = {p for p in tagged if p in candidates}
+            pool = sorted(candidates, key=self._order.__getitem__)
+        else:
+            pool = self._agents
+
+        query_lower = query.query.lower()
+        if query_lower:
+            # Walk the skill posting sets rather than the whole registry
+            skill_hits = set().union(*(self._by_skill.get(s.lower(), ()) for s in query.skills))
+            ranked = await self._rank_text(
+                query.query, query.max_results, candidates, query.force_hybrid
+            )
+            ordered = chain(
+                sorted((p for p in skill_hits if p in candidates), key=self._order.__getitem__),
+                ranked,
+                # Substring scan runs lazily, only if the ranked hits leave room
+                (p for p in pool if p in candidates and query_lower in self._search_index[p]),
+            )
+        else:
+            ordered = (p for p in pool if p in candidates)
+
+        results = []
+        seen = set()
+        for path in ordered:
+            if path in seen:
+                continue
+            if len(results) >= query.max_results:
+                break
+            seen.add(path)
+            results.append(self._info_cache[path])
+        return results
+
+    async def _rank_text(
+        self, text: str, k: int, candidates: Container[str], force_hybrid: bool = False
+    ) -> list[str]:
+        """Rank candidate paths for query text.
+
+        Confident BM25 results (high top score, clear margin over the runner-up) are
+        returned as-is; otherwise BM25 and dense rankings are merged with
+        reciprocal-rank fusion. If the query embedding fails or times out, the BM25
+        ranking is used and dense search is skipped for a short while.
+        """
+        hits = self._bm25.search(text, max(k, 2), candidates)
+        keyword = [p for p, _ in hits[:k]]
+
+        top1 = hits[0][1] if hits else 0.0
+        top2 = hits[1][1] if len(hits) > 1 else 0.0
+        if (
+            not force_hybrid
+            and top1 >= settings.discovery_bm25_min_score
+            and top1 - top2 >= settings.discovery_bm25_min_margin
+        ):
+            self._record_discovery("bm25_only")
+            return keyword
+
+        if not len(self._embeddings) or time.monotonic() < self._dense_retry_at:
+            self._record_discovery("bm25_fallback")
+            return keyword
+        q_vec = await ollama_service.generate_embeddings(
+            text, timeout=settings.discovery_embed_timeout
+        )
+        if not q_vec:
+            self._dense_retry_at = time.monotonic() + _DENSE_RETRY_DELAY
+            self._record_discovery("bm25_fallback")
+            return keyword
+
+        self._record_discovery("hybrid")
+        dense = [
+            p
+            for p, score in self._embeddings.search(q_vec, k, candidates)
+            if score >= settings.discovery_min_similarity
+        ]
+        return _rrf_fuse(keyword, dense)
+
+    def _record_discovery(self, route: str) -> None:
+        """Count which ranking route a discovery query took."""
+        self._discovery_stats[route] += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            total = sum(self._discovery_stats.values())
+            logger.debug(
+                f"Discovery BM25-only rate: {self._discovery_stats['bm25_only'] / total:.2%} "
+                f"of {total} queries"
+            )
+
+    @property
+    def discovery_stats(self) -> dict[str, int]:
+        """Counts of discovery queries by ranking route (BM25 alone, hybrid, BM25 fallback)."""
+        return dict(self._discovery_stats)
+
+    @staticmethod
+    def _embedding_text(agent: AgentCard) -> str:
+        """Text embedded for semantic discovery of an agent."""
+        return agent.description + " " + " ".join(s.name for s in agent.skills)
+
+    def _schedule_embedding(self, agent: AgentCard) -> None:
+        """Embed an agent in the background if an event loop is running."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._embed_agent(agent))
+        self._embed_tasks.add(task)
+        task.add_done_callback(self._embed_tasks.discard)
+
+    async def _embed_agent(self, agent: AgentCard) -> None:
+        """Compute and store the embedding for one agent."""
+        vector = await ollama_service.generate_embeddings(self._embedding_text(agent))
+        # Skip if the agent was updated or deleted while embedding
+        if vector and self._agents.get(agent.path) is agent:
+            self._embeddings.upsert(agent.path, vector)
+
+    def schedule_embedding_index(self) -> None:
+        """Build the embedding index in a background task."""
+        task = asyncio.get_running_loop().create_task(self.build_embedding_index())
+        self._embed_tasks.add(task)
+        task.add_done_callback(self._embed_tasks.discard)
+
+    async def build_embedding_index(self) -> None:
+        """Embed all registered agents for semantic discovery."""
+        agents = list(self._agents.values())
+        vectors = await ollama_service.generate_embeddings_batch(
+            [self._embedding_text(a) for a in agents]
+        )
+        # Skip agents updated or deleted while embedding
+        current = [
+            (agent.path, vector)
+            for agent, vector in zip(agents, vectors)
+            if vector and self._agents.get(agent.path) is agent
+        ]
+        if current:
+            paths, matrix = zip(*current)
+            self._embeddings.upsert_many(paths, matrix)
+        logger.info(f"Embedded {len(self._embeddings)} agents for discovery")
+
 
 # Global instance
 agent_service = AgentService()
@@ -1,10 +1,13 @@
 """JWT authentication middleware for Agent Gateway."""
 
-import json
+import hashlib
 import logging
+import time
+from collections import OrderedDict
 from typing import Optional
 
 import httpx
+import orjson
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
@@ -13,14 +16,31 @@ from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Token validation cache
+_TOKEN_CACHE_TTL = 30.0  # seconds, for valid tokens
+_TOKEN_NEGATIVE_TTL = 1.0  # seconds, for rejected tokens
+_TOKEN_CACHE_MAX = 4096
+
 
 class AuthMiddleware(BaseHTTPMiddleware):
     """Middleware to validate JWT tokens with auth-server."""
 
     def __init__(self, app):
         super().__init__(app)
-        self.public_paths = set(settings.public_paths.split(","))
-        self.client = httpx.AsyncClient(timeout=10.0)
+        public_paths = settings.public_paths.split(",")
+        self._public_exact = frozenset(p for p in public_paths if not p.endswith("/"))
+        # Paths ending in / match as prefixes
+        self._public_prefixes = tuple(p for p in public_paths if p.endswith("/"))
+        self.client = httpx.AsyncClient(
+            http2=settings.http2_enabled,
+            limits=httpx.Limits(
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                max_connections=settings.http_max_connections,
+            ),
+            timeout=httpx.Timeout(10.0, connect=5.0),
+        )
+        # blake2b(token) -> (expiry, user or None for rejected tokens)
+        self._token_cache: OrderedDict[bytes, tuple[float, Optional[dict]]] = OrderedDict()
 
     async def dispatch(self, request: Request, call_next):
         """Validate token before processing request."""
@@ -55,14 +75,7 @@ class AuthMiddleware(BaseHTTPMiddleware):
 
     def _is_public_path(self, path: str) -> bool:
         """Check if path is public (no auth required)."""
-        # Exact match
-        if path in self.public_paths:
-            return True
-        # Prefix match for paths ending in /
-        for public_path in self.public_paths:
-            if public_path.endswith("/") and path.startswith(public_path):
-                return True
-        return False
+        return path in self._public_exact or path.startswith(self._public_prefixes)
 
     def _extract_token(self, request: Request) -> Optional[str]:
         """Extract Bearer token from Authorization header."""
@@ -72,7 +85,29 @@ class AuthMiddleware(BaseHTTPMiddleware):
         return None
 
     async def _validate_token(self, token: str) -> Optional[dict]:
-        """Validate token with auth-server."""
+        """Validate token, using cached results from recent validations."""
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        cached = self._token_cache.get(key)
+        if cached is not None:
+            expiry, user = cached
+            if time.monotonic() < expiry:
+                self._token_cache.move_to_end(key)
+                return user
+            del self._token_cache[key]
+
+        user, cacheable = await self._fetch_token_user(token)
+        if cacheable:
+            ttl = _TOKEN_CACHE_TTL if user else _TOKEN_NEGATIVE_TTL
+            self._token_cache[key] = (time.monotonic() + ttl, user)
+            if len(self._token_cache) > _TOKEN_CACHE_MAX:
+                self._token_cache.popitem(last=False)
+        return user
+
+    async def _fetch_token_user(self, token: str) -> tuple[Optional[dict], bool]:
+        """Validate token with auth-server.
+
+        Returns the user info (None if invalid) and whether the result may be cached.
+        """
         try:
             response = await self.client.get(
                 f"{settings.auth_server_url}/validate",
@@ -80,18 +115,21 @@ class AuthMiddleware(BaseHTTPMiddleware):
                     "Authorization": f"Bearer {token}",
                 },
             )
-            if response.status_code == 200:
-                # Auth server returns user info in response headers or body
-                result = response.json() if response.text else {}
-                # Also check for user info in headers
-                if "X-User-Sub" in response.headers:
-                    result["sub"] = response.headers.get("X-User-Sub")
-                    result["username"] = response.headers.get("X-User-Username")
-                    result["email"] = response.headers.get("X-User-Email")
-                return result if result else {"validated": True}
-            logger.warning(f"Token validation failed: {response.status_code}")
-            return None
+            if response.status_code != 200:
+                logger.warning(f"Token validation failed: {response.status_code}")
+                return None, response.status_code in (401, 403)
+
+            # Auth server returns user info in response headers; only parse body as fallback
+            sub = response.headers.get("X-User-Sub")
+            if sub:
+                return {
+                    "sub": sub,
+                    "username": response.headers.get("X-User-Username"),
+                    "email": response.headers.get("X-User-Email"),
+                }, True
+            result = orjson.loads(response.content) if response.content else None
+            return (result or {"validated": True}), True
         except Exception as e:
             logger.error(f"Auth server error: {e}")
             # Fail open in dev, fail closed in prod
-            return None
+            return None, False
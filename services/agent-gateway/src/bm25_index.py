@@ -0,0 +1,86 @@
+"""Incremental BM25 keyword index for agent discovery."""
+
+import math
+import re
+from collections import Counter
+from typing import Container, Optional
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercased alphanumeric tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index that supports add/remove.
+
+    Postings map each term to the documents containing it, so scoring a query
+    only touches documents that share at least one term with it.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Initialize an empty index."""
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[str, int]] = {}  # term -> {doc: term frequency}
+        self._doc_terms: dict[str, Counter] = {}
+        self._doc_len: dict[str, int] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index a document, replacing any previous version."""
+        self.remove(doc_id)
+        tokens = tokenize(text)
+        terms = Counter(tokens)
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        self._doc_terms[doc_id] = terms
+        self._doc_len[doc_id] = len(tokens)
+        self._total_len += len(tokens)
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document from the index."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self._postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        allowed: Optional[Container[str]] = None,
+    ) -> list[tuple[str, float]]:
+        """Return up to k (doc_id, score) pairs with a positive score, best first.
+
+        If allowed is given, only those documents are considered.
+        """
+        n_docs = len(self._doc_len)
+        if not n_docs or k <= 0:
+            return []
+
+        avg_len = self._total_len / n_docs or 1.0
+        scores: dict[str, float] = {}
+        for term in set(tokenize(query)):
+            docs = self._postings.get(term)
+            if not docs:
+                continue
+            idf = math.log((n_docs - len(docs) + 0.5) / (len(docs) + 0.5) + 1.0)
+            for doc_id, tf in docs.items():
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = self.k1 * (1.0 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:k]
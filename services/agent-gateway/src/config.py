@@ -17,9 +17,21 @@ class Settings(BaseSettings):
     ollama_host: str = "http://host.docker.internal:11434"
     default_model: str = "qwen3:30b"
     coder_model: str = "qwen2.5-coder:32b"
+    default_num_ctx: int = 8192
+
+    # Outbound HTTP clients
+    http2_enabled: bool = True
+    http_max_keepalive_connections: int = 100
+    http_max_connections: int = 200
 
     # Agent discovery
     agent_discovery_interval: int = 60  # seconds
+    embedding_model: str = "nomic-embed-text"
+    discovery_min_similarity: float = 0.5  # cosine; dense hits below this are dropped
+    discovery_embed_timeout: float = 2.0  # seconds; query embedding on the request path
+    # Skip the embedding call when BM25 alone is confident
+    discovery_bm25_min_score: float = 8.0
+    discovery_bm25_min_margin: float = 2.0
     health_check_timeout: int = 10  # seconds
 
     # Storage
@@ -0,0 +1,123 @@
+"""In-memory dense vector index for agent discovery."""
+
+from typing import Container, Optional, Sequence
+
+import numpy as np
+
+
+class EmbeddingIndex:
+    """Cosine-similarity index over L2-normalized float32 embeddings.
+
+    Vectors are stored as rows of one contiguous matrix so a query is scored
+    against every agent with a single matrix-vector product. The matrix grows
+    by doubling its capacity, so appending a row does not copy the others.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._paths: list[str] = []
+        self._rows: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def _reserve(self, size: int, dim: int) -> None:
+        """Ensure room for at least size rows of the given dimension."""
+        capacity = self._matrix.shape[0]
+        if size <= capacity:
+            return
+        matrix = np.empty((max(size, 2 * capacity, 16), dim), dtype=np.float32)
+        if self._paths:
+            matrix[: len(self._paths)] = self._matrix[: len(self._paths)]
+        self._matrix = matrix
+
+    def upsert(self, path: str, vector: Sequence[float]) -> None:
+        """Add or replace the embedding for an agent path."""
+        self.upsert_many([path], [vector])
+
+    def upsert_many(self, paths: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Add or replace embeddings for several agent paths at once.
+
+        Vectors are converted and normalized as one matrix; zero vectors are skipped.
+        """
+        if not paths:
+            return
+        m = np.asarray(vectors, dtype=np.float32)
+        if m.ndim != 2 or not m.shape[1]:
+            return
+        norms = np.linalg.norm(m, axis=1)
+        keep = norms > 0
+        m = m[keep] / norms[keep, np.newaxis]
+        paths = [p for p, k in zip(paths, keep) if k]
+        if not paths:
+            return
+
+        dim = m.shape[1]
+        if self._matrix.shape[0] and dim != self._matrix.shape[1]:
+            # Embedding model changed dimension; previous vectors are incomparable
+            self.clear()
+
+        rows = []
+        new_paths = []
+        for path in paths:
+            row = self._rows.get(path)
+            if row is None:
+                row = len(self._paths) + len(new_paths)
+                self._rows[path] = row
+                new_paths.append(path)
+            rows.append(row)
+        self._reserve(len(self._paths) + len(new_paths), dim)
+        self._paths.extend(new_paths)
+        self._matrix[rows] = m
+
+    def remove(self, path: str) -> None:
+        """Remove an agent path, moving the last row into its slot."""
+        row = self._rows.pop(path, None)
+        if row is None:
+            return
+        last = len(self._paths) - 1
+        if row != last:
+            moved = self._paths[last]
+            self._matrix[row] = self._matrix[last]
+            self._paths[row] = moved
+            self._rows[moved] = row
+        self._paths.pop()
+
+    def clear(self) -> None:
+        """Drop all embeddings."""
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._paths.clear()
+        self._rows.clear()
+
+    def search(
+        self,
+        vector: Sequence[float],
+        k: int,
+        allowed: Optional[Container[str]] = None,
+    ) -> list[tuple[str, float]]:
+        """Return up to k (path, cosine similarity) pairs, best first.
+
+        If allowed is given, only those paths are considered.
+        """
+        q = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(q) if q.ndim == 1 else 0.0
+        if not norm or not self._paths or k <= 0 or q.shape[0] != self._matrix.shape[1]:
+            return []
+
+        scores = self._matrix[: len(self._paths)] @ (q / norm)
+        if allowed is not None:
+            # Walk rows best-first so membership is only tested until k rows pass
+            results = []
+            for i in np.argsort(-scores):
+                path = self._paths[i]
+                if path in allowed:
+                    results.append((path, float(scores[i])))
+                    if len(results) == k:
+                        break
+            return results
+
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._paths[i], float(scores[i])) for i in top]
@@ -1,19 +1,25 @@
 """Agent Gateway - A2A Agent Registry with MCP integration and local model support."""
 
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
 from typing import Any, Optional
 
+import msgspec
+import orjson
 import uvicorn
-from fastapi import FastAPI, HTTPException, Query, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import ValidationError
 
 from agent_service import agent_service
 from config import settings
 from mcp_client import mcp_client
 from models import AgentCard, AgentInfo, AgentRegistrationRequest, DiscoveryQuery
 from ollama_service import ollama_service
+from orjson_response import ORJSONResponse
 
 # Initialize OpenLLMetry tracing before other imports that might be instrumented
 if settings.tracing_enabled:
@@ -27,13 +33,46 @@ if settings.tracing_enabled:
         disable_batch=False,  # Batch traces for efficiency
     )
 
+# Epoch timestamps avoid a strftime call per record; thread/process lookups are unused
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    format="%(created).3f %(levelname).1s %(name)s %(message)s",
 )
 logger = logging.getLogger(__name__)
 
 
+def _build_agent_card() -> bytes:
+    """Encode this gateway's agent card; it is fixed for the life of the process."""
+    return orjson.dumps(
+        {
+            "name": "Agent Gateway",
+            "description": "Central agent registry with MCP integration and local model support",
+            "url": f"http://{settings.host}:{settings.port}",
+            "protocolVersion": "1.0.0",
+            "skills": [
+                {
+                    "id": "discover-agents",
+                    "name": "Discover Agents",
+                    "description": "Find agents by skills or natural language query",
+                },
+                {
+                    "id": "discover-tools",
+                    "name": "Discover Tools",
+                    "description": "Find MCP tools from registered servers",
+                },
+                {
+                    "id": "local-inference",
+                    "name": "Local Inference",
+                    "description": "Run inference on local Ollama models",
+                },
+            ],
+        }
+    )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
@@ -45,6 +84,8 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("Tracing disabled")
 
+    app.state.agent_card_bytes = _build_agent_card()
+
     # Initialize agent service
     agent_service.initialize()
 
@@ -52,6 +93,9 @@ async def lifespan(app: FastAPI):
     models = await ollama_service.discover_models()
     logger.info(f"Found {len(models)} local Ollama models")
 
+    # Embed agents for semantic discovery in the background; ranking falls back to BM25 meanwhile
+    agent_service.schedule_embedding_index()
+
     # Check MCP Registry connectivity
     mcp_healthy = await mcp_client.health_check()
     if mcp_healthy:
@@ -62,7 +106,9 @@ async def lifespan(app: FastAPI):
     yield
 
     # Cleanup
+    await agent_service.flush()
     await mcp_client.close()
+    await ollama_service.close()
     logger.info("Agent Gateway shut down")
 
 
@@ -71,6 +117,7 @@ app = FastAPI(
     description="A2A Agent Registry with MCP integration and local model support",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add auth middleware if enabled
@@ -88,14 +135,17 @@ if settings.auth_enabled:
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    ollama_available = await ollama_service.is_available()
-    mcp_available = await mcp_client.health_check()
+    ollama_available, mcp_available = await asyncio.gather(
+        ollama_service.is_available(),
+        mcp_client.health_check(),
+    )
 
     return {
         "status": "healthy",
         "ollama": "connected" if ollama_available else "unavailable",
         "mcp_registry": "connected" if mcp_available else "unavailable",
         "agents": len(agent_service.list_agents()),
+        "discovery": agent_service.discovery_stats,
         "tracing": "enabled" if settings.tracing_enabled else "disabled",
         "auth": "enabled" if settings.auth_enabled else "disabled",
     }
@@ -104,29 +154,7 @@ async def health():
 @app.get("/.well-known/agent.json")
 async def agent_card():
     """Return this gateway's own agent card for A2A discovery."""
-    return {
-        "name": "Agent Gateway",
-        "description": "Central agent registry with MCP integration and local model support",
-        "url": f"http://{settings.host}:{settings.port}",
-        "protocolVersion": "1.0.0",
-        "skills": [
-            {
-                "id": "discover-agents",
-                "name": "Discover Agents",
-                "description": "Find agents by skills or natural language query",
-            },
-            {
-                "id": "discover-tools",
-                "name": "Discover Tools",
-                "description": "Find MCP tools from registered servers",
-            },
-            {
-                "id": "local-inference",
-                "name": "Local Inference",
-                "description": "Run inference on local Ollama models",
-            },
-        ],
-    }
+    return Response(content=app.state.agent_card_bytes, media_type="application/json")
 
 
 # =============================================================================
@@ -134,9 +162,32 @@ async def agent_card():
 # =============================================================================
 
 
-@app.post("/api/agents/register", status_code=status.HTTP_201_CREATED)
-async def register_agent(request: AgentRegistrationRequest):
+@app.post(
+    "/api/agents/register",
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": AgentRegistrationRequest.model_json_schema()}
+            },
+        }
+    },
+)
+async def register_agent(http_request: Request):
     """Register a new A2A agent."""
+    # Decode with msgspec, then validate the plain dict with Pydantic
+    try:
+        data = msgspec.json.decode(await http_request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON: {e}")
+    try:
+        request = AgentRegistrationRequest.model_validate(data)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        )
+
     try:
         agent = agent_service.register(request)
         return {
@@ -155,42 +206,40 @@ async def register_agent(request: AgentRegistrationRequest):
 async def list_agents(
     enabled_only: bool = Query(False),
     query: Optional[str] = Query(None),
-) -> dict[str, Any]:
+) -> Response:
     """List all registered agents."""
-    agents = agent_service.list_agents(enabled_only=enabled_only)
+    if not enabled_only and not query:
+        return Response(content=agent_service.listing_json(), media_type="application/json")
 
     # Simple text search if query provided
     if query:
-        query_lower = query.lower()
-        agents = [
-            a
-            for a in agents
-            if query_lower in a.name.lower()
-            or query_lower in a.description.lower()
-            or any(query_lower in t.lower() for t in a.tags)
-        ]
+        agents = agent_service.search(query.lower(), enabled_only=enabled_only)
+    else:
+        agents = agent_service.list_agents(enabled_only=enabled_only)
 
-    return {
-        "agents": [agent_service.to_info(a).model_dump() for a in agents],
-        "total": len(agents),
-    }
+    return ORJSONResponse(
+        {
+            "agents": [agent_service.get_info(a.path) for a in agents],
+            "total": len(agents),
+        }
+    )
 
 
 @app.get("/api/agents/{path:path}")
-async def get_agent(path: str) -> dict[str, Any]:
+async def get_agent(path: str) -> ORJSONResponse:
     """Get agent by path."""
     agent = agent_service.get(path)
     if not agent:
         raise HTTPException(status_code=404, detail=f"Agent not found: {path}")
-    return agent.model_dump(mode="json")
+    return ORJSONResponse(agent.model_dump())
 
 
 @app.put("/api/agents/{path:path}")
-async def update_agent(path: str, updates: dict[str, Any]) -> dict[str, Any]:
+async def update_agent(path: str, updates: dict[str, Any]) -> ORJSONResponse:
     """Update an existing agent."""
     try:
         agent = agent_service.update(path, updates)
-        return agent.model_dump(mode="json")
+        return ORJSONResponse(agent.model_dump())
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -217,7 +266,7 @@ async def toggle_agent(path: str, enabled: bool = Query(...)):
 
 
 @app.post("/api/discover")
-async def discover(query: DiscoveryQuery) -> dict[str, Any]:
+async def discover(query: DiscoveryQuery) -> ORJSONResponse:
     """Unified discovery across agents, MCP servers, and local models."""
     results = {
         "agents": [],
@@ -226,20 +275,9 @@ async def discover(query: DiscoveryQuery) -> dict[str, Any]:
     }
 
     # Search local agents
-    agents = agent_service.list_agents(enabled_only=True)
+    results["agents"] = await agent_service.discover(query)
     query_lower = query.query.lower()
 
-    for agent in agents:
-        searchable = f"{agent.name} {agent.description} {' '.join(agent.tags)}"
-        skill_names = [s.name.lower() for s in agent.skills]
-
-        # Match by query text or requested skills
-        matches_query = query_lower in searchable.lower()
-        matches_skills = any(s.lower() in skill_names for s in query.skills)
-
-        if matches_query or matches_skills or not query.query:
-            results["agents"].append(agent_service.to_info(agent).model_dump())
-
     # Search MCP Registry
     if not query.require_local:
         try:
@@ -250,21 +288,27 @@ async def discover(query: DiscoveryQuery) -> dict[str, Any]:
 
     # Include local models if relevant
     if query.require_local or "local" in query_lower or "ollama" in query_lower:
-        models = await ollama_service.discover_models()
-        results["local_models"] = [m.model_dump() for m in models]
+        models = await ollama_service.get_models()
+        results["local_models"] = models
 
-    return results
+    return ORJSONResponse(results)
 
 
 @app.get("/api/tools")
 async def list_tools() -> dict[str, Any]:
     """List all available tools from MCP servers."""
     servers = await mcp_client.list_servers()
-    all_tools = []
+    paths = [server.get("path", "") for server in servers]
+    tool_lists = await asyncio.gather(
+        *(mcp_client.get_server_tools(path) for path in paths),
+        return_exceptions=True,
+    )
 
-    for server in servers:
-        server_path = server.get("path", "")
-        tools = await mcp_client.get_server_tools(server_path)
+    all_tools = []
+    for server_path, tools in zip(paths, tool_lists):
+        if isinstance(tools, Exception):
+            logger.error(f"Failed to get tools for {server_path}: {tools}")
+            continue
         for tool in tools:
             tool["server"] = server_path
             all_tools.append(tool)
@@ -278,14 +322,16 @@ async def list_tools() -> dict[str, Any]:
 
 
 @app.get("/api/models")
-async def list_models() -> dict[str, Any]:
+async def list_models() -> ORJSONResponse:
     """List available local Ollama models."""
-    models = await ollama_service.discover_models()
-    return {
-        "models": [m.model_dump() for m in models],
-        "default": settings.default_model,
-        "available": await ollama_service.is_available(),
-    }
+    models = await ollama_service.get_models()
+    return ORJSONResponse(
+        {
+            "models": models,
+            "default": settings.default_model,
+            "available": await ollama_service.is_available(),
+        }
+    )
 
 
 @app.post("/api/chat")
@@ -301,13 +347,7 @@ async def chat(
         raise HTTPException(status_code=503, detail="Ollama not available")
 
     try:
-        response = await ollama_service.chat(model=model, messages=messages, tools=tools)
-        # Convert response object to dict if needed
-        if hasattr(response, "model_dump"):
-            return response.model_dump()
-        elif hasattr(response, "__dict__"):
-            return dict(response)
-        return response
+        return await ollama_service.chat(model=model, messages=messages, tools=tools)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -23,7 +23,12 @@ class MCPRegistryClient:
         if self._client is None:
             self._client = httpx.AsyncClient(
                 base_url=self.base_url,
-                timeout=30.0,
+                http2=settings.http2_enabled,
+                limits=httpx.Limits(
+                    max_keepalive_connections=settings.http_max_keepalive_connections,
+                    max_connections=settings.http_max_connections,
+                ),
+                timeout=httpx.Timeout(30.0, connect=5.0),
             )
         return self._client
 
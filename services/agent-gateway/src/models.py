@@ -1,53 +1,48 @@
-"""Pydantic models for Agent Gateway - A2A protocol compliant."""
+"""Data models for Agent Gateway - A2A protocol compliant.
+
+Pydantic models validate external input; internal DTOs that are never built
+from untrusted data are msgspec Structs.
+"""
 
 from datetime import datetime
-from enum import Enum
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
-from pydantic import BaseModel, Field, HttpUrl
+import msgspec
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, field_validator
 
 
 class AgentProvider(BaseModel):
     """Agent provider information."""
 
-    organization: str
-    url: Optional[HttpUrl] = None
-
-
-class SkillInputMode(str, Enum):
-    """Supported input modes for skills."""
-
-    TEXT = "text"
-    AUDIO = "audio"
-    VIDEO = "video"
-    FILE = "file"
-    STREAMING = "streaming"
+    model_config = ConfigDict(frozen=True)
 
+    organization: str
+    url: Optional[str] = None  # Validated at registration, not on every load
 
-class SkillOutputMode(str, Enum):
-    """Supported output modes for skills."""
 
-    TEXT = "text"
-    AUDIO = "audio"
-    VIDEO = "video"
-    FILE = "file"
-    STREAMING = "streaming"
+# Supported input/output modes for skills
+SkillInputMode = Literal["text", "audio", "video", "file", "streaming"]
+SkillOutputMode = Literal["text", "audio", "video", "file", "streaming"]
 
 
 class Skill(BaseModel):
     """A2A Agent Skill definition."""
 
+    model_config = ConfigDict(frozen=True)
+
     id: str
     name: str
     description: str
-    input_modes: list[SkillInputMode] = Field(default_factory=lambda: [SkillInputMode.TEXT])
-    output_modes: list[SkillOutputMode] = Field(default_factory=lambda: [SkillOutputMode.TEXT])
+    input_modes: list[SkillInputMode] = Field(default_factory=lambda: ["text"])
+    output_modes: list[SkillOutputMode] = Field(default_factory=lambda: ["text"])
     parameters: Optional[dict[str, Any]] = None
 
 
 class SecurityScheme(BaseModel):
     """Security scheme for agent authentication."""
 
+    model_config = ConfigDict(frozen=True)
+
     type: str  # bearer, oauth2, apiKey
     scheme: Optional[str] = None
     bearer_format: Optional[str] = None
@@ -57,10 +52,12 @@ class SecurityScheme(BaseModel):
 class AgentCard(BaseModel):
     """A2A Agent Card - the core discovery document."""
 
+    model_config = ConfigDict(extra="ignore")  # Tolerate legacy fields on disk
+
     # Required fields
     name: str
     description: str
-    url: HttpUrl
+    url: str  # Validated as HttpUrl at registration, not on every load
     path: str = Field(description="Unique path identifier, e.g., /code-reviewer")
 
     # Protocol
@@ -109,31 +106,41 @@ class AgentRegistrationRequest(BaseModel):
     skills: list[dict[str, Any]] = Field(default_factory=list)
     streaming: bool = False
     security_schemes: Optional[dict[str, Any]] = None
-    tags: str = ""  # Comma-separated
+    tags: list[str] = Field(default_factory=list)  # Accepts a comma-separated string
     license: Optional[str] = None
     visibility: str = "public"
 
+    @field_validator("tags", mode="before")
+    @classmethod
+    def _split_tags(cls, v: Any) -> Any:
+        """Normalize tags once: split, strip, lowercase and dedupe."""
+        if isinstance(v, str):
+            v = v.split(",")
+        if not isinstance(v, list) or not all(isinstance(t, str) for t in v):
+            return v  # Let field validation report the type error
+        return list(dict.fromkeys(t.strip().lower() for t in v if t.strip()))
 
-class LocalModelConfig(BaseModel):
+
+class LocalModelConfig(msgspec.Struct, frozen=True, gc=False):
     """Configuration for a local Ollama model."""
 
     name: str
     model_id: str  # Ollama model name, e.g., qwen3:30b
     description: str
-    capabilities: list[str] = Field(default_factory=list)  # coding, reasoning, chat, tools
+    capabilities: frozenset[str] = frozenset()  # coding, reasoning, chat, tools
     context_length: int = 8192
     is_default: bool = False
 
 
-class AgentInfo(BaseModel):
+class AgentInfo(msgspec.Struct, gc=False):
     """Summary info for agent listings."""
 
     name: str
     description: str
     path: str
     url: str
-    tags: list[str] = Field(default_factory=list)
-    skills: list[str] = Field(default_factory=list)
+    tags: list[str] = []
+    skills: list[str] = []
     num_skills: int = 0
     is_enabled: bool = True
     provider: Optional[str] = None
@@ -149,4 +156,5 @@ class DiscoveryQuery(BaseModel):
     skills: list[str] = Field(default_factory=list)
     tags: list[str] = Field(default_factory=list)
     require_local: bool = False  # Only return agents with local model support
-    max_results: int = 10
+    max_results: int = Field(10, ge=1)
+    force_hybrid: bool = False  # Always run embedding search, even for confident keyword hits
@@ -1,101 +1,204 @@
 """Ollama integration for local model support."""
 
+import asyncio
+import hashlib
 import logging
+import re
+import time
+from collections import OrderedDict
 from typing import Any, AsyncIterator, Optional
 
 import httpx
-from ollama import AsyncClient
+import msgspec
+import orjson
 
 from config import settings
 from models import LocalModelConfig
 
 logger = logging.getLogger(__name__)
 
+_DEFAULT_CAPS = frozenset({"chat"})
+
+# Back-off before retrying /api/tags after a failed discovery
+_DISCOVERY_RETRY_DELAY = 5.0
+
+# Embeddings kept for repeated agent descriptions and discovery queries
+_EMBED_CACHE_MAX = 4096
+
+
+def _model_key(name: str) -> str:
+    """Canonical Ollama model name; an untagged name means the "latest" tag."""
+    return name if ":" in name else f"{name}:latest"
+
+
+class _OllamaModelEntry(msgspec.Struct):
+    """Model entry in Ollama's /api/tags response."""
+
+    name: str = ""
+    model: str = ""
+    details: Optional[dict[str, Any]] = None
+
+
+class _OllamaTagsResponse(msgspec.Struct):
+    """Ollama /api/tags response."""
+
+    models: list[_OllamaModelEntry] = []
+
 
 class OllamaService:
     """Service for interacting with local Ollama models."""
 
     def __init__(self):
         """Initialize Ollama client."""
-        self.client = AsyncClient(host=settings.ollama_host)
+        # Single pooled client so chat/embedding calls reuse keep-alive connections
+        self._http = httpx.AsyncClient(
+            base_url=settings.ollama_host,
+            http2=settings.http2_enabled,
+            timeout=httpx.Timeout(connect=5.0, read=120.0, write=30.0, pool=5.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=16,
+                max_connections=32,
+                keepalive_expiry=30.0,
+            ),
+        )
         self._available_models: dict[str, LocalModelConfig] = {}
+        self._default_options = {"num_ctx": settings.default_num_ctx}
+        self._discovery_lock = asyncio.Lock()
+        self._discovery_ts = 0.0  # monotonic time of last successful discovery
+        self._discovery_ttl = 60.0
+        self._discovery_retry_at = 0.0  # monotonic time before which failures are not retried
+        # (model, blake2b(text)) -> embedding, least recently used first
+        self._embed_cache: OrderedDict[tuple[str, bytes], list[float]] = OrderedDict()
+        # Shared frozensets: every model of a family references the same object
         self._model_capabilities = {
-            "qwen3": ["reasoning", "chat", "tools", "coding"],
-            "qwen2.5-coder": ["coding", "tools", "chat"],
-            "dolphin-mixtral": ["chat", "uncensored", "reasoning"],
-            "llama3": ["chat", "reasoning", "tools"],
-            "mistral": ["chat", "reasoning", "coding"],
-            "codellama": ["coding"],
-            "deepseek-coder": ["coding", "tools"],
+            family: frozenset(caps)
+            for family, caps in {
+                "qwen3": ["reasoning", "chat", "tools", "coding"],
+                "qwen2.5-coder": ["coding", "tools", "chat"],
+                "dolphin-mixtral": ["chat", "uncensored", "reasoning"],
+                "llama3": ["chat", "reasoning", "tools"],
+                "mistral": ["chat", "reasoning", "coding"],
+                "codellama": ["coding"],
+                "deepseek-coder": ["coding", "tools"],
+            }.items()
         }
+        # One alternation over all families; the matching group index maps to capabilities
+        self._family_pattern = re.compile(
+            "|".join(
+                f"(?P<_{i}>{re.escape(family)})"
+                for i, family in enumerate(self._model_capabilities)
+            ),
+            re.IGNORECASE,
+        )
+        self._caps_by_idx = list(self._model_capabilities.values())
 
     async def discover_models(self) -> list[LocalModelConfig]:
         """Discover available Ollama models."""
         try:
-            response = await self.client.list()
+            response = await self._http.get("/api/tags")
+            response.raise_for_status()
+            tags = msgspec.json.decode(response.content, type=_OllamaTagsResponse)
             models = []
 
-            # Handle both dict and ListResponse object formats
-            model_list = response.get("models", []) if isinstance(response, dict) else getattr(response, "models", [])
-
-            for model in model_list:
-                # Handle both dict and Model object formats
-                if isinstance(model, dict):
-                    name = model.get("name", "")
-                    details = model.get("details", {})
-                else:
-                    name = getattr(model, "name", "") or getattr(model, "model", "")
-                    details = getattr(model, "details", {}) or {}
-                    if not isinstance(details, dict):
-                        details = {"family": getattr(details, "family", "")}
-
+            for entry in tags.models:
+                name = entry.name or entry.model
                 if not name:
                     continue
+                details = entry.details or {}
 
-                model_id = name.split(":")[0] if ":" in name else name
+                model_id = name.partition(":")[0]
 
                 # Determine capabilities based on model family
-                capabilities = []
-                for family, caps in self._model_capabilities.items():
-                    if family in model_id.lower():
-                        capabilities = caps
-                        break
-
-                if not capabilities:
-                    capabilities = ["chat"]  # Default
+                match = self._family_pattern.search(model_id)
+                if match:
+                    capabilities = self._caps_by_idx[int(match.lastgroup[1:])]
+                else:
+                    capabilities = _DEFAULT_CAPS
 
                 config = LocalModelConfig(
                     name=name,
                     model_id=name,
                     description=f"Local Ollama model: {name}",
                     capabilities=capabilities,
-                    context_length=details.get("context_length", 8192) if isinstance(details, dict) else 8192,
+                    context_length=details.get("context_length", 8192),
                     is_default=(name == settings.default_model),
                 )
                 models.append(config)
-                self._available_models[name] = config
 
+            self._available_models = {m.name: m for m in models}
+            self._discovery_ts = time.monotonic()
+            self._evict_embeddings()
             logger.info(f"Discovered {len(models)} Ollama models")
             return models
 
         except Exception as e:
+            self._discovery_retry_at = time.monotonic() + _DISCOVERY_RETRY_DELAY
             logger.error(f"Failed to discover Ollama models: {e}")
             return []
 
+    def _evict_embeddings(self) -> None:
+        """Drop cached embeddings for models that are no longer installed."""
+        installed = {_model_key(name) for name in self._available_models}
+        stale = [key for key in self._embed_cache if _model_key(key[0]) not in installed]
+        for key in stale:
+            del self._embed_cache[key]
+
+    async def close(self) -> None:
+        """Close the HTTP client."""
+        await self._http.aclose()
+
+    def _discovery_fresh(self) -> bool:
+        """Check whether the last successful discovery is within the TTL."""
+        return time.monotonic() - self._discovery_ts <= self._discovery_ttl
+
+    def _needs_discovery(self) -> bool:
+        """Check whether models are stale and a failed attempt is not backing off."""
+        if self._available_models and self._discovery_fresh():
+            return False
+        return time.monotonic() >= self._discovery_retry_at
+
+    async def get_models(self) -> list[LocalModelConfig]:
+        """Get available models, rediscovering at most once per TTL."""
+        if self._needs_discovery():
+            async with self._discovery_lock:
+                # Another caller may have refreshed (or failed) while we waited
+                if self._needs_discovery():
+                    await self.discover_models()
+        return list(self._available_models.values())
+
     async def is_available(self) -> bool:
         """Check if Ollama is available."""
-        try:
-            await self.client.list()
+        if self._available_models and self._discovery_fresh():
             return True
+        try:
+            response = await self._http.get("/api/version")
+            return response.status_code == 200
         except Exception:
             return False
 
     async def get_model(self, model_name: str) -> Optional[LocalModelConfig]:
         """Get model config by name."""
-        if not self._available_models:
-            await self.discover_models()
+        await self.get_models()
         return self._available_models.get(model_name)
 
+    def _chat_body(
+        self,
+        model: str,
+        messages: list[dict[str, str]],
+        tools: Optional[list[dict[str, Any]]],
+        stream: bool,
+    ) -> bytes:
+        """Encode an /api/chat request body using the shared default options."""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "stream": stream,
+            "options": self._default_options,
+        }
+        if tools:
+            payload["tools"] = tools
+        return orjson.dumps(payload)
+
     async def chat(
         self,
         model: str,
@@ -108,13 +211,10 @@ class OllamaService:
             if stream:
                 return self._stream_chat(model, messages, tools)
 
-            response = await self.client.chat(
-                model=model,
-                messages=messages,
-                tools=tools,
-                options={"num_ctx": 8192},
-            )
-            return response
+            body = self._chat_body(model, messages, tools, stream=False)
+            response = await self._http.post("/api/chat", content=body)
+            response.raise_for_status()
+            return orjson.loads(response.content)
 
         except Exception as e:
             logger.error(f"Ollama chat error: {e}")
@@ -126,25 +226,66 @@ class OllamaService:
         messages: list[dict[str, str]],
         tools: Optional[list[dict[str, Any]]] = None,
     ) -> AsyncIterator[dict[str, Any]]:
-        """Stream chat completion."""
-        async for chunk in await self.client.chat(
-            model=model,
-            messages=messages,
-            tools=tools,
-            stream=True,
-            options={"num_ctx": 8192},
-        ):
-            yield chunk
-
-    async def generate_embeddings(self, text: str, model: str = "nomic-embed-text") -> list[float]:
+        """Stream chat completion as parsed NDJSON chunks."""
+        body = self._chat_body(model, messages, tools, stream=True)
+        async with self._http.stream("POST", "/api/chat", content=body) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    yield orjson.loads(line)
+
+    async def generate_embeddings(
+        self, text: str, model: Optional[str] = None, timeout: Optional[float] = None
+    ) -> list[float]:
         """Generate embeddings for text."""
+        embeddings = await self.generate_embeddings_batch([text], model, timeout)
+        return embeddings[0] if embeddings else []
+
+    async def generate_embeddings_batch(
+        self, texts: list[str], model: Optional[str] = None, timeout: Optional[float] = None
+    ) -> list[list[float]]:
+        """Generate embeddings for several texts in one request.
+
+        Cached texts are served from memory; only the rest are sent to Ollama.
+        A timeout (seconds) overrides the client's chat-sized timeouts for this call.
+        Returns one embedding per input text, or an empty list on failure.
+        """
+        if not texts:
+            return []
+        model = model or settings.embedding_model
+        cache = self._embed_cache
+        keys = [(model, hashlib.blake2b(t.encode(), digest_size=16).digest()) for t in texts]
+        results: list[Optional[list[float]]] = []
+        for key in keys:
+            embedding = cache.get(key)
+            if embedding is not None:
+                cache.move_to_end(key)
+            results.append(embedding)
+
+        missing = [i for i, embedding in enumerate(results) if embedding is None]
+        if not missing:
+            return results
         try:
-            response = await self.client.embeddings(model=model, prompt=text)
-            return response.get("embedding", [])
+            response = await self._http.post(
+                "/api/embed",
+                content=orjson.dumps({"model": model, "input": [texts[i] for i in missing]}),
+                timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else httpx.Timeout(timeout),
+            )
+            response.raise_for_status()
+            embeddings = orjson.loads(response.content).get("embeddings", [])
+            if len(embeddings) != len(missing):
+                raise ValueError(f"expected {len(missing)} embeddings, got {len(embeddings)}")
         except Exception as e:
-            logger.error(f"Embedding generation failed: {e}")
+            logger.error(f"Embedding generation failed: {e!r}")
             return []
 
+        for i, embedding in zip(missing, embeddings):
+            results[i] = embedding
+            cache[keys[i]] = embedding
+        while len(cache) > _EMBED_CACHE_MAX:
+            cache.popitem(last=False)
+        return results
+
 
 # Global instance
 ollama_service = OllamaService()
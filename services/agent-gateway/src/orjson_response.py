@@ -0,0 +1,31 @@
+"""orjson-backed JSON response for Agent Gateway."""
+
+from typing import Any
+
+import msgspec
+import orjson
+from starlette.responses import JSONResponse
+
+_OPTIONS = (
+    orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+)
+
+
+def _default(obj: Any) -> Any:
+    """Encode types orjson does not handle natively."""
+    if isinstance(obj, msgspec.Struct):
+        return msgspec.to_builtins(obj, order="deterministic")
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    Handlers can return Pydantic dumps, msgspec Structs and plain dicts directly,
+    skipping FastAPI's jsonable_encoder and response-model validation.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_OPTIONS)
@@ -0,0 +1,92 @@
+"""Column-oriented view of the agent registry for discovery filtering."""
+
+import numpy as np
+
+VISIBILITY_CODES = {"public": 0, "private": 1, "group-restricted": 2}
+PUBLIC = VISIBILITY_CODES["public"]
+_UNKNOWN_VISIBILITY = 255
+
+
+class AgentRegistryColumns:
+    """Struct-of-arrays mirror of the fields discovery filters on.
+
+    Each agent occupies one row across parallel columns, so a filter pass
+    reads a couple of small arrays instead of every AgentCard. The canonical
+    cards stay in AgentService; this only holds what filtering needs.
+    """
+
+    def __init__(self, capacity: int = 64):
+        """Initialize empty columns."""
+        self.paths: list[str] = []
+        self._rows: dict[str, int] = {}
+        self.enabled_mask = np.zeros(capacity, dtype=np.bool_)
+        self.visibility_codes = np.full(capacity, _UNKNOWN_VISIBILITY, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _grow(self) -> None:
+        """Double column capacity."""
+        size = max(2 * self.enabled_mask.shape[0], 1)
+        self.enabled_mask = np.resize(self.enabled_mask, size)
+        self.visibility_codes = np.resize(self.visibility_codes, size)
+
+    def upsert(self, path: str, enabled: bool, visibility: str) -> None:
+        """Add or replace the row for an agent path."""
+        row = self._rows.get(path)
+        if row is None:
+            row = len(self.paths)
+            if row == self.enabled_mask.shape[0]:
+                self._grow()
+            self._rows[path] = row
+            self.paths.append(path)
+        self.enabled_mask[row] = enabled
+        self.visibility_codes[row] = VISIBILITY_CODES.get(visibility, _UNKNOWN_VISIBILITY)
+
+    def set_enabled(self, path: str, enabled: bool) -> None:
+        """Update the enabled flag for an agent path."""
+        row = self._rows.get(path)
+        if row is not None:
+            self.enabled_mask[row] = enabled
+
+    def remove(self, path: str) -> None:
+        """Remove an agent path, moving the last row into its slot."""
+        row = self._rows.pop(path, None)
+        if row is None:
+            return
+        last = len(self.paths) - 1
+        if row != last:
+            moved = self.paths[last]
+            self.enabled_mask[row] = self.enabled_mask[last]
+            self.visibility_codes[row] = self.visibility_codes[last]
+            self.paths[row] = moved
+            self._rows[moved] = row
+        self.paths.pop()
+
+    def is_discoverable(self, path: str) -> bool:
+        """Check whether an agent is both enabled and publicly visible."""
+        row = self._rows.get(path)
+        return (
+            row is not None
+            and bool(self.enabled_mask[row])
+            and int(self.visibility_codes[row]) == PUBLIC
+        )
+
+    def discoverable(self) -> "DiscoverableView":
+        """Live membership view of enabled, public agents; `path in view` is O(1)."""
+        return DiscoverableView(self)
+
+
+class DiscoverableView:
+    """Container over AgentRegistryColumns holding the enabled, public paths.
+
+    Lets rankers filter their own hits without materializing the full set.
+    """
+
+    __slots__ = ("_columns",)
+
+    def __init__(self, columns: AgentRegistryColumns):
+        self._columns = columns
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, str) and self._columns.is_discoverable(path)
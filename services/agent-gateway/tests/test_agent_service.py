@@ -0,0 +1,154 @@
+"""Tests for AgentService persistence, migration and discovery filtering."""
+
+import orjson
+import pytest
+
+import agent_service
+from agent_service import AgentService
+from models import AgentRegistrationRequest, DiscoveryQuery
+
+
+def _make_service(data_dir) -> AgentService:
+    service = AgentService()
+    service._data_dir = data_dir
+    service.initialize()
+    return service
+
+
+def _card(name: str, **extra) -> dict:
+    return {
+        "name": name,
+        "description": f"{name} agent",
+        "url": "http://agents.local:8000/",
+        "path": f"/{name}",
+        **extra,
+    }
+
+
+def _register(service: AgentService, name: str, **extra):
+    request = AgentRegistrationRequest(
+        name=name, description=f"{name} helper", url="http://agents.local:8000", **extra
+    )
+    return service.register(request)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    path = tmp_path / "agents"
+    path.mkdir()
+    return path
+
+
+def test_load_agents_last_line_wins_and_bad_lines_are_skipped(data_dir):
+    lines = [
+        orjson.dumps(_card("alpha")),
+        b"{not json",
+        orjson.dumps(_card("alpha", description="updated")),
+        orjson.dumps(_card("beta")),
+    ]
+    (data_dir / "agents.jsonl").write_bytes(b"\n".join(lines) + b"\n")
+
+    service = _make_service(data_dir)
+
+    assert [a.path for a in service.list_agents()] == ["/alpha", "/beta"]
+    assert service.get("/alpha").description == "updated"
+
+
+def test_migration_folds_legacy_files_into_jsonl(data_dir):
+    (data_dir / "alpha_agent.json").write_bytes(orjson.dumps(_card("alpha", legacy_field=1)))
+    (data_dir / "broken_agent.json").write_bytes(b"{nope")
+
+    service = _make_service(data_dir)
+
+    assert [a.path for a in service.list_agents(enabled_only=True)] == ["/alpha"]
+    assert (data_dir / "agents.jsonl").exists()
+    assert (data_dir / "alpha_agent.json.migrated").exists()
+    assert not (data_dir / "alpha_agent.json").exists()
+    # Unparseable files are left in place for inspection
+    assert (data_dir / "broken_agent.json").exists()
+
+    reloaded = _make_service(data_dir)
+    assert [a.path for a in reloaded.list_agents()] == ["/alpha"]
+
+
+def test_migration_keeps_legacy_files_when_write_fails(data_dir, monkeypatch):
+    (data_dir / "alpha_agent.json").write_bytes(orjson.dumps(_card("alpha")))
+
+    def fail_write(path, data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(agent_service, "_atomic_write_bytes", fail_write)
+    service = _make_service(data_dir)
+
+    assert service.get("/alpha") is not None
+    assert (data_dir / "alpha_agent.json").exists()
+    assert service._agents_dirty
+
+
+def test_migration_keeps_agents_already_in_jsonl(data_dir):
+    (data_dir / "agents.jsonl").write_bytes(orjson.dumps(_card("alpha")) + b"\n")
+    legacy = _card("alpha", description="stale legacy copy")
+    (data_dir / "alpha_agent.json").write_bytes(orjson.dumps(legacy))
+
+    service = _make_service(data_dir)
+
+    assert service.get("/alpha").description == "alpha agent"
+
+
+def test_register_update_delete_persist_across_reload(data_dir):
+    service = _make_service(data_dir)
+    _register(service, "alpha", tags="Python, review")
+    _register(service, "beta")
+    service.update("/alpha", {"description": "changed"})
+    service.delete("/beta")
+
+    reloaded = _make_service(data_dir)
+
+    assert [a.path for a in reloaded.list_agents()] == ["/alpha"]
+    assert reloaded.get("/alpha").description == "changed"
+    assert reloaded.get("/alpha").tags == ["python", "review"]
+
+
+def test_columns_follow_toggle_and_delete(data_dir):
+    service = _make_service(data_dir)
+    for name in ("alpha", "beta", "gamma"):
+        _register(service, name)
+    view = service._columns.discoverable()
+
+    service.toggle("/beta", False)
+    assert "/beta" not in view
+    service.toggle("/beta", True)
+    assert "/beta" in view
+
+    service.delete("/alpha")
+    assert "/alpha" not in view
+    assert len(service._columns) == 2
+    assert "/gamma" in view
+
+
+async def test_discover_skips_disabled_and_private_agents(data_dir):
+    service = _make_service(data_dir)
+    _register(service, "alpha")
+    _register(service, "beta")
+    _register(service, "gamma", visibility="private")
+    service.toggle("/beta", False)
+
+    results = await service.discover(DiscoveryQuery(query=""))
+    assert [r["path"] for r in results] == ["/alpha"]
+
+    service.toggle("/beta", True)
+    service.update("/alpha", {"visibility": "private"})
+    results = await service.discover(DiscoveryQuery(query="helper"))
+    assert [r["path"] for r in results] == ["/beta"]
+
+
+async def test_discover_orders_skill_hits_by_registration(data_dir):
+    service = _make_service(data_dir)
+    skill = {"id": "lint", "name": "Lint", "description": "lints code"}
+    for name in ("alpha", "beta", "gamma"):
+        _register(service, name, skills=[skill])
+    service.update("/alpha", {"description": "alpha changed"})
+
+    results = await service.discover(DiscoveryQuery(query="zzz", skills=["LINT"], max_results=2))
+
+    assert [r["path"] for r in results] == ["/alpha", "/beta"]
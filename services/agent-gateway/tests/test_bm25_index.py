@@ -0,0 +1,63 @@
+"""Tests for the BM25 keyword index."""
+
+from bm25_index import BM25Index, tokenize
+
+
+def test_tokenize_lowercases_and_splits_on_punctuation():
+    assert tokenize("Code-Reviewer, SQL v2!") == ["code", "reviewer", "sql", "v2"]
+
+
+def test_search_ranks_by_term_relevance():
+    index = BM25Index()
+    index.add("/sql", "sql query builder for postgres sql")
+    index.add("/review", "code review for python")
+    index.add("/docs", "writes documentation")
+
+    hits = index.search("sql", 10)
+
+    assert [doc for doc, _ in hits] == ["/sql"]
+    assert hits[0][1] > 0
+
+
+def test_rarer_terms_score_higher():
+    index = BM25Index()
+    index.add("/a", "python helper")
+    index.add("/b", "python linter")
+    index.add("/c", "python formatter")
+
+    scores = dict(index.search("python linter", 10))
+
+    assert scores["/b"] > scores["/a"]
+    assert scores["/a"] == scores["/c"]
+
+
+def test_search_respects_k_and_allowed():
+    index = BM25Index()
+    for i in range(5):
+        index.add(f"/agent{i}", "shared term")
+
+    assert len(index.search("shared", 2)) == 2
+    assert [doc for doc, _ in index.search("shared", 10, {"/agent3"})] == ["/agent3"]
+    assert index.search("shared", 0) == []
+
+
+def test_add_replaces_previous_document():
+    index = BM25Index()
+    index.add("/a", "python")
+    index.add("/a", "golang")
+
+    assert len(index) == 1
+    assert index.search("python", 10) == []
+    assert [doc for doc, _ in index.search("golang", 10)] == ["/a"]
+
+
+def test_remove_drops_document_and_postings():
+    index = BM25Index()
+    index.add("/a", "python tools")
+    index.add("/b", "python")
+    index.remove("/a")
+    index.remove("/missing")
+
+    assert len(index) == 1
+    assert index.search("tools", 10) == []
+    assert [doc for doc, _ in index.search("python", 10)] == ["/b"]
@@ -0,0 +1,93 @@
+"""Tests for the dense embedding index."""
+
+import numpy as np
+
+from embedding_index import EmbeddingIndex
+
+
+def test_search_returns_top_k_by_cosine_similarity():
+    index = EmbeddingIndex()
+    index.upsert("/x", [1.0, 0.0, 0.0])
+    index.upsert("/xy", [1.0, 1.0, 0.0])
+    index.upsert("/z", [0.0, 0.0, 5.0])
+
+    hits = index.search([2.0, 0.0, 0.0], 2)
+
+    assert [path for path, _ in hits] == ["/x", "/xy"]
+    assert hits[0][1] == np.float32(1.0)
+    assert abs(hits[1][1] - 1 / np.sqrt(2)) < 1e-6
+
+
+def test_search_filters_by_allowed():
+    index = EmbeddingIndex()
+    index.upsert_many(["/a", "/b", "/c"], [[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]])
+
+    hits = index.search([1.0, 0.0], 2, allowed={"/b", "/c"})
+
+    assert [path for path, _ in hits] == ["/b", "/c"]
+
+
+def test_upsert_replaces_existing_vector():
+    index = EmbeddingIndex()
+    index.upsert("/a", [1.0, 0.0])
+    index.upsert("/a", [0.0, 1.0])
+
+    assert len(index) == 1
+    assert index.search([0.0, 1.0], 1)[0][0] == "/a"
+    assert index.search([0.0, 1.0], 1)[0][1] > 0.99
+
+
+def test_zero_and_empty_vectors_are_ignored():
+    index = EmbeddingIndex()
+    index.upsert("/zero", [0.0, 0.0])
+    index.upsert("/empty", [])
+
+    assert len(index) == 0
+    assert index.search([1.0, 0.0], 3) == []
+
+
+def test_remove_keeps_remaining_rows_searchable():
+    index = EmbeddingIndex()
+    vectors = {f"/p{i}": np.eye(8)[i].tolist() for i in range(8)}
+    index.upsert_many(list(vectors), list(vectors.values()))
+
+    index.remove("/p0")
+    index.remove("/p5")
+    index.remove("/missing")
+
+    assert len(index) == 6
+    for path, vector in vectors.items():
+        hits = index.search(vector, 1)
+        if path in ("/p0", "/p5"):
+            assert not hits or hits[0][0] != path
+        else:
+            assert hits[0][0] == path
+
+
+def test_growth_past_initial_capacity():
+    index = EmbeddingIndex()
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(100, 16))
+    for i, vector in enumerate(vectors):
+        index.upsert(f"/p{i}", vector.tolist())
+
+    assert len(index) == 100
+    assert index.search(vectors[42].tolist(), 1)[0][0] == "/p42"
+
+
+def test_dimension_change_resets_index():
+    index = EmbeddingIndex()
+    index.upsert("/a", [1.0, 0.0, 0.0])
+    index.upsert("/b", [1.0, 0.0, 0.0, 0.0])
+
+    assert len(index) == 1
+    assert index.search([1.0, 0.0, 0.0, 0.0], 5)[0][0] == "/b"
+
+
+def test_dimension_change_after_removing_all_rows():
+    index = EmbeddingIndex()
+    index.upsert("/a", [1.0, 2.0, 3.0])
+    index.remove("/a")
+    index.upsert("/b", [1.0, 2.0, 3.0, 4.0])
+
+    assert [path for path, _ in index.search([1.0, 2.0, 3.0, 4.0], 1)] == ["/b"]
@@ -0,0 +1,44 @@
+"""Tests for the struct-of-arrays registry columns."""
+
+from registry_columns import AgentRegistryColumns
+
+
+def test_discoverable_requires_enabled_and_public():
+    columns = AgentRegistryColumns()
+    columns.upsert("/public", True, "public")
+    columns.upsert("/disabled", False, "public")
+    columns.upsert("/private", True, "private")
+    columns.upsert("/unknown", True, "something-else")
+
+    view = columns.discoverable()
+
+    assert "/public" in view
+    assert "/disabled" not in view
+    assert "/private" not in view
+    assert "/unknown" not in view
+    assert "/missing" not in view
+
+
+def test_view_tracks_later_changes():
+    columns = AgentRegistryColumns()
+    columns.upsert("/a", True, "public")
+    view = columns.discoverable()
+
+    columns.set_enabled("/a", False)
+    assert "/a" not in view
+
+    columns.upsert("/a", True, "public")
+    assert "/a" in view
+
+
+def test_remove_moves_last_row_into_slot():
+    columns = AgentRegistryColumns(capacity=2)
+    for i in range(5):
+        columns.upsert(f"/a{i}", i % 2 == 0, "public")
+
+    columns.remove("/a0")
+    columns.remove("/missing")
+
+    assert len(columns) == 4
+    assert sorted(columns.paths) == ["/a1", "/a2", "/a3", "/a4"]
+    assert {p for p in columns.paths if columns.is_discoverable(p)} == {"/a2", "/a4"}